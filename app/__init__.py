@@ -1,15 +1,163 @@
-from flask import Flask
-from config import UPLOAD_FOLDER
+import time
+from flask import Flask, request, g, jsonify, render_template
+from config import (
+    UPLOAD_FOLDER,
+    MAX_CONTENT_LENGTH,
+    MEMORY_TRACKING,
+    MEMORY_DEBUG_HEADER,
+    PROFILE_SAMPLE_RATE,
+    PROFILE_ADMIN_TOKEN,
+    PROFILE_DIR,
+    PROFILE_MAX_FILES,
+    PREDICTION_LOG_ENABLED,
+    PREDICTION_LOG_DIR,
+    PREDICTION_LOG_TOP_K,
+    PREDICTION_LOG_HASH_IMAGES,
+    PREDICTION_LOG_SEGMENT_MB,
+    PREDICTION_LOG_SEGMENT_SECONDS,
+)
+
+# Endpoints that decode images and run inference
+TRACKED_ENDPOINTS = {'main.upload', 'api.detect_disease'}
 
 def create_app():
     app = Flask(__name__)
     app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-    
+    app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
+    app.config['MEMORY_TRACKING'] = MEMORY_TRACKING
+    app.config['MEMORY_DEBUG_HEADER'] = MEMORY_DEBUG_HEADER
+
     # Import and register blueprints
     from app.routes.main import main_bp
     from app.routes.api import api_bp
-    
+    from app.routes.assets import init_assets
+
     app.register_blueprint(main_bp)
     app.register_blueprint(api_bp, url_prefix='/api')
-    
-    return app
\ No newline at end of file
+    init_assets(app)
+
+    register_memory_tracking(app)
+    register_profiling(app)
+
+    if PREDICTION_LOG_ENABLED:
+        from app.utils import prediction_log
+        app.extensions['prediction_log'] = prediction_log.configure(
+            PREDICTION_LOG_DIR,
+            top_k=PREDICTION_LOG_TOP_K,
+            hash_images=PREDICTION_LOG_HASH_IMAGES,
+            max_segment_bytes=PREDICTION_LOG_SEGMENT_MB * 1024 * 1024,
+            max_segment_age=PREDICTION_LOG_SEGMENT_SECONDS,
+        )
+
+    @app.errorhandler(413)
+    def request_too_large(error):
+        limit_mb = app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)
+        message = f"Upload exceeds the {limit_mb} MB limit"
+        if request.path.startswith('/api/'):
+            return jsonify({"error": message}), 413
+        # Render the form directly: flash() needs a SECRET_KEY, which is not set
+        return render_template('upload.html', error=message), 413
+
+    return app
+
+def register_memory_tracking(app):
+    """Measure memory use of image requests when MEMORY_TRACKING is on"""
+    from app.utils.memory import memory_tracker
+
+    @app.before_request
+    def start_memory_tracking():
+        if not app.config['MEMORY_TRACKING']:
+            return
+        if request.method == 'POST' and request.endpoint in TRACKED_ENDPOINTS:
+            g.memory_baseline = memory_tracker.start()
+
+    @app.teardown_request
+    def stop_memory_tracking(exc=None):
+        # teardown also runs when the view raised, so start/stop stay paired
+        baseline = g.pop('memory_baseline', None)
+        if baseline is None:
+            return
+        heap_peak, rss_delta = memory_tracker.stop(baseline)
+        rss_text = f"{rss_delta / 1024 / 1024:+.1f} MiB" if rss_delta is not None else "n/a"
+        print(f"[memory] {request.method} {request.path} "
+              f"python_heap_peak={heap_peak / 1024 / 1024:.1f} MiB rss_delta={rss_text}")
+
+    @app.after_request
+    def add_memory_header(response):
+        if not app.config['MEMORY_DEBUG_HEADER'] or 'memory_baseline' not in g:
+            return response
+        # The response body is already rendered, so this covers the whole view
+        heap_peak, rss_delta = memory_tracker.measure(g.memory_baseline)
+        response.headers['X-Request-Python-Heap-Peak'] = str(heap_peak)
+        if rss_delta is not None:
+            response.headers['X-Request-RSS-Delta'] = str(rss_delta)
+        return response
+
+def register_profiling(app):
+    """
+    Capture cProfile profiles of image requests on demand
+
+    Triggered by the X-Profile header carrying PROFILE_ADMIN_TOKEN or by
+    PROFILE_SAMPLE_RATE. When neither is configured no hooks are installed,
+    so requests pay nothing.
+    """
+    from app.utils.profiling import RequestProfiler
+
+    profiler = RequestProfiler(
+        PROFILE_DIR,
+        sample_rate=PROFILE_SAMPLE_RATE,
+        admin_token=PROFILE_ADMIN_TOKEN,
+        max_files=PROFILE_MAX_FILES,
+    )
+    app.extensions['request_profiler'] = profiler
+    if not profiler.enabled:
+        return
+
+    @app.before_request
+    def start_profiling():
+        if request.method != 'POST' or request.endpoint not in TRACKED_ENDPOINTS:
+            return
+        trigger = profiler.trigger(request.headers.get('X-Profile'))
+        if trigger is None:
+            return
+        active = profiler.start()
+        if active is not None:
+            g.profile = (active, trigger, time.perf_counter())
+
+    @app.after_request
+    def record_profile_status(response):
+        if 'profile' in g:
+            g.profile_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def stop_profiling(exc=None):
+        state = g.pop('profile', None)
+        if state is None:
+            return
+        active, trigger, started = state
+        # Only use request attributes that cannot raise here: touching the
+        # form data would re-raise e.g. RequestEntityTooLarge. profiler.stop()
+        # must always run, or cProfile stays enabled and the lock stays held
+        metadata = {
+            "trigger": trigger,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "timestamp": time.time(),
+        }
+        name = None
+        try:
+            metadata.update({
+                "method": request.method,
+                "path": request.path,
+                "endpoint": request.endpoint,
+                "status": g.get('profile_status', 500),
+                "content_length": request.content_length,
+                "error": repr(exc) if exc is not None else None,
+            })
+        finally:
+            try:
+                name = profiler.stop(active, metadata)
+            except Exception as e:
+                print(f"✗ Could not save request profile: {e}")
+        if name is not None:
+            print(f"[profile] {request.method} {request.path} -> {name}")
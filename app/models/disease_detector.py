@@ -1,9 +1,21 @@
 import os
+import time
 import numpy as np
 import pandas as pd
 from tensorflow.keras.preprocessing import image
 from tensorflow.keras.models import load_model
-from config import MODEL_PATH
+from config import (
+    MODEL_PATH,
+    MODEL_VERSION,
+    TILED_INFERENCE,
+    TILED_MIN_ASPECT,
+    TILED_MAX_SIDE,
+    TILE_OVERLAP,
+    MAX_TILES,
+    TILE_MIN_AGREEMENT,
+)
+from app.utils.tiling import prepare_tiles, merge_regions
+from app.utils import prediction_log
 
 class DiseaseDetector:
     def __init__(self):
@@ -11,6 +23,7 @@ class DiseaseDetector:
         Initialize the disease detector with the trained MobileNetV2 model
         """
         self.model = None
+        self.input_size = 224
         self.class_names = CLASS_LABELS = {
     0:  "American Bollworm on Cotton",
     1:  "Anthracnose on Cotton",
@@ -81,6 +94,9 @@ class DiseaseDetector:
         if os.path.exists(MODEL_PATH):
             try:
                 self.model = load_model(MODEL_PATH)
+                # Distilled students may use a lower input resolution
+                if self.model.input_shape[1]:
+                    self.input_size = self.model.input_shape[1]
                 print(f"✓ Model loaded successfully from {MODEL_PATH}")
                 print(f"  - Input shape: {self.model.input_shape}")
                 print(f"  - Output classes: {self.model.output_shape[-1]}")
@@ -94,10 +110,10 @@ class DiseaseDetector:
     def preprocess_image(self, img_path):
         """
         Preprocess the image for MobileNetV2 prediction
-        - Resize to 224x224
+        - Resize to the model input size (224x224 for the teacher)
         - Normalize to [0, 1] range
         """
-        img = image.load_img(img_path, target_size=(224, 224))
+        img = image.load_img(img_path, target_size=(self.input_size, self.input_size))
         img_array = image.img_to_array(img)
         img_array = np.expand_dims(img_array, axis=0)
         img_array = img_array / 255.0 
@@ -106,15 +122,25 @@ class DiseaseDetector:
     def preprocess_image_from_stream(self, stream):
         """
         Preprocess image from in-memory stream (file-like object)
-        - Resize to 224x224
+        - Resize to the model input size
         - Normalize to [0, 1] range
         """
         from PIL import Image as PILImage
-        img = PILImage.open(stream)
-        img = img.resize((224, 224))
-        img_array = image.img_to_array(img)
-        img_array = np.expand_dims(img_array, axis=0)
-        img_array = img_array / 255.0 
+        with PILImage.open(stream) as img:
+            return self.preprocess_pil_image(img)
+    
+    def preprocess_pil_image(self, img):
+        """
+        Preprocess an already decoded PIL image
+        - Resize to the model input size (only the small resized copy is converted)
+        - Normalize to [0, 1] range in float32, in place
+        """
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        resized = img.resize((self.input_size, self.input_size))
+        img_array = np.asarray(resized, dtype=np.float32)[np.newaxis, ...]
+        resized.close()
+        img_array /= 255.0
         return img_array
     
     def predict(self, img_path):
@@ -147,15 +173,126 @@ class DiseaseDetector:
         img_array = self.preprocess_image_from_stream(stream)
         return self._get_prediction(img_array)
     
-    def _get_prediction(self, img_array):
+    def predict_from_image(self, img, tiled=None, image_hash=None):
+        """
+        Predict the disease from a decoded PIL image
+        
+        tiled=None follows the TILED_INFERENCE setting; True/False force
+        tiled or single-pass inference. image_hash is the upload's digest for
+        the prediction log.
+        """
+        if self.model is None:
+            return {
+                "disease": "Model Not Available",
+                "confidence": 0.0,
+                "symptoms": ["The disease detection model is not loaded. Please train the model first."],
+                "cure": ["Train the model by running: python train.py"]
+            }
+        
+        if self._should_tile(img, tiled):
+            return self.predict_tiled(img, image_hash)
+        
+        img_array = self.preprocess_pil_image(img)
+        return self._get_prediction(img_array, image_hash)
+    
+    def _should_tile(self, img, tiled):
+        if tiled is not None:
+            return tiled
+        if TILED_INFERENCE == 'on':
+            return True
+        if TILED_INFERENCE == 'auto':
+            return max(img.size) / min(img.size) >= TILED_MIN_ASPECT
+        return False
+    
+    def predict_tiled(self, img, image_hash=None):
+        """
+        Predict diseases on a large photo using overlapping model-sized tiles
+        - Background tiles are dropped by a vegetation/variance filter
+        - The whole-image view and all surviving tiles run as one batch
+        - The whole-image view decides unless it is unsure or healthy; then a
+          disease only wins if TILE_MIN_AGREEMENT overlapping tiles agree on it
+        """
+        # Keep the same tile grid when the model uses a lower input resolution
+        tiles, boxes, total_tiles = prepare_tiles(
+            img,
+            max_side=round(TILED_MAX_SIDE * self.input_size / 224),
+            tile_size=self.input_size,
+            overlap=TILE_OVERLAP,
+            max_tiles=MAX_TILES,
+        )
+        whole = self.preprocess_pil_image(img)
+        batch = np.concatenate([whole, tiles])
+        start = time.perf_counter()
+        predictions = self.model.predict(batch, batch_size=len(batch))
+        latency_ms = (time.perf_counter() - start) * 1000
+        
+        # Log the whole-image softmax so tiled rows stay a real distribution
+        prediction_log.record(MODEL_VERSION, predictions[0], latency_ms, image_hash, tiles=len(tiles))
+        
+        detections = []
+        for tile_probs, box in zip(predictions[1:], boxes):
+            confidence = float(tile_probs.max())
+            if confidence >= 0.5:
+                detections.append({
+                    "class_id": int(tile_probs.argmax()),
+                    "confidence": confidence,
+                    "box": box,
+                })
+        regions = merge_regions(detections)
+        
+        whole_class = int(np.argmax(predictions[0]))
+        whole_confidence = float(predictions[0][whole_class])
+        # A single tile is too weak to overrule the whole image; require a
+        # region that several overlapping tiles agree on
+        supported = [
+            region for region in regions
+            if region["tiles"] >= TILE_MIN_AGREEMENT
+            and not self._is_healthy_class(region["class_id"])
+        ]
+        
+        if whole_confidence >= 0.5 and not self._is_healthy_class(whole_class):
+            result = self._build_result(whole_class, whole_confidence)
+        elif supported:
+            region = supported[0]
+            result = self._build_result(region["class_id"], region["confidence"])
+        else:
+            result = self._build_result(whole_class, whole_confidence)
+        
+        result["mode"] = "tiled"
+        result["tiles_total"] = total_tiles
+        result["tiles_analyzed"] = len(tiles)
+        result["regions"] = [
+            {
+                "disease": self._format_disease_name(self.class_names.get(region["class_id"], "Unknown Disease")),
+                "confidence": region["confidence"],
+                "box": list(region["box"]),
+                "tiles": region["tiles"],
+            }
+            for region in regions
+        ]
+        return result
+    
+    def _is_healthy_class(self, class_id):
+        return "healthy" in self.class_names.get(class_id, "").lower()
+    
+    def _get_prediction(self, img_array, image_hash=None):
         """
         Get prediction from preprocessed image array
         """
         
+        start = time.perf_counter()
         predictions = self.model.predict(img_array)
+        latency_ms = (time.perf_counter() - start) * 1000
+        prediction_log.record(MODEL_VERSION, predictions[0], latency_ms, image_hash)
+        
         predicted_class = np.argmax(predictions[0])
         confidence = np.max(predictions[0])
-        
+        return self._build_result(predicted_class, confidence)
+    
+    def _build_result(self, predicted_class, confidence):
+        """
+        Build the response dict for a predicted class and its confidence
+        """
         if confidence < 0.5:  
             return {
                 "disease": "Unable to Detect Disease",
@@ -0,0 +1,222 @@
+"""
+Knowledge distillation of the production MobileNetV2 into a smaller student
+
+The teacher is the trained production model; the student is a MobileNetV2 with
+a reduced width multiplier and/or input resolution. Students are trained on a
+mix of the (MixUp/CutMix-blended) hard labels and the teacher's temperature-
+softened predictions, and end with a softmax layer so DiseaseDetector can load
+them exactly like the teacher.
+"""
+
+import time
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.applications import MobileNetV2
+from tensorflow.keras.layers import GlobalAveragePooling2D, Dense, Dropout
+from tensorflow.keras.models import Model
+from tensorflow.keras.optimizers import Adam
+
+# Input sizes and width multipliers with published ImageNet weights
+IMAGENET_INPUT_SIZES = (96, 128, 160, 192, 224)
+IMAGENET_WIDTHS = (0.35, 0.5, 0.75, 1.0, 1.3, 1.4)
+
+
+def mixup(image1, label1, image2, label2, alpha=0.2):
+    lam = np.random.beta(alpha, alpha)
+    image = lam * image1 + (1 - lam) * image2
+    label = lam * label1 + (1 - lam) * label2
+    return image, label
+
+
+def cutmix(image1, label1, image2, label2, alpha=0.2):
+    lam = np.random.beta(alpha, alpha)
+    h, w, _ = image1.shape
+    rx, ry = np.random.randint(w), np.random.randint(h)
+    rw, rh = int(w * np.sqrt(1 - lam)), int(h * np.sqrt(1 - lam))
+    x1, y1 = np.clip(rx - rw // 2, 0, w), np.clip(ry - rh // 2, 0, h)
+    x2, y2 = np.clip(rx + rw // 2, 0, w), np.clip(ry + rh // 2, 0, h)
+
+    image = image1.copy()
+    image[y1:y2, x1:x2] = image2[y1:y2, x1:x2]
+    lam = 1 - ((x2 - x1) * (y2 - y1) / (w * h))
+    label = lam * label1 + (1 - lam) * label2
+    return image, label
+
+
+def augment_batch(images, labels):
+    """Apply MixUp or CutMix (50/50) to every image, as in the teacher's training"""
+    images, labels = images.copy(), labels.copy()
+    for i in range(len(images)):
+        j = np.random.randint(len(images))
+        if np.random.rand() > 0.5:
+            images[i], labels[i] = mixup(images[i], labels[i], images[j], labels[j])
+        else:
+            images[i], labels[i] = cutmix(images[i], labels[i], images[j], labels[j])
+    return images, labels
+
+
+def create_student_model(num_classes, width_multiplier=0.35, input_size=160):
+    """
+    Build a reduced MobileNetV2 student with the same head as the teacher
+
+    Args:
+        num_classes (int): Number of output classes
+        width_multiplier (float): MobileNetV2 alpha (channel width multiplier)
+        input_size (int): Square input resolution
+
+    Returns:
+        keras.Model: Student model with softmax outputs
+    """
+    # ImageNet weights only exist for some width/resolution combinations
+    weights = 'imagenet'
+    if width_multiplier not in IMAGENET_WIDTHS or input_size not in IMAGENET_INPUT_SIZES:
+        print(f"⚠ No ImageNet weights for width={width_multiplier}, size={input_size}; "
+              "training the student backbone from scratch")
+        weights = None
+
+    base_model = MobileNetV2(
+        input_shape=(input_size, input_size, 3),
+        alpha=width_multiplier,
+        include_top=False,
+        weights=weights
+    )
+
+    x = GlobalAveragePooling2D()(base_model.output)
+    x = Dense(256, activation='relu')(x)
+    x = Dropout(0.5)(x)
+    output = Dense(num_classes, activation='softmax')(x)
+
+    return Model(base_model.input, output, name=f"mobilenetv2_student_{width_multiplier}_{input_size}")
+
+
+def soften(probabilities, temperature):
+    """Temperature-scale softmax outputs (equivalent to softmax(logits / T))"""
+    logits = tf.math.log(tf.clip_by_value(probabilities, 1e-7, 1.0))
+    return tf.nn.softmax(logits / temperature, axis=-1)
+
+
+def distillation_loss(labels, teacher_probs, student_probs, temperature=4.0, alpha=0.1):
+    """
+    Hinton et al. distillation loss
+
+    alpha weights the hard-label cross-entropy; (1 - alpha) weights the KL
+    divergence between softened teacher and student distributions, scaled by
+    T^2 so its gradients stay comparable across temperatures.
+    """
+    hard_loss = tf.keras.losses.categorical_crossentropy(labels, student_probs)
+    soft_loss = tf.keras.losses.kl_divergence(
+        soften(teacher_probs, temperature),
+        soften(student_probs, temperature)
+    ) * (temperature ** 2)
+    return tf.reduce_mean(alpha * hard_loss + (1 - alpha) * soft_loss)
+
+
+def resize_batch(images, input_size):
+    """Resize an image batch to a model's input resolution if needed"""
+    if images.shape[1] == input_size and images.shape[2] == input_size:
+        return images
+    return tf.image.resize(images, (input_size, input_size))
+
+
+def model_input_size(model):
+    return model.input_shape[1]
+
+
+def evaluate_accuracy(model, generator):
+    """Top-1 accuracy of a model over one pass of a directory generator"""
+    input_size = model_input_size(model)
+    correct = 0
+    total = 0
+    for step in range(len(generator)):
+        images, labels = generator[step]
+        probs = model(resize_batch(images, input_size), training=False)
+        correct += int(np.sum(np.argmax(probs, axis=-1) == np.argmax(labels, axis=-1)))
+        total += len(labels)
+    return correct / total if total else 0.0
+
+
+def measure_cpu_latency(model, runs=50, warmup=5):
+    """
+    Median single-image forward-pass latency on CPU in milliseconds
+    """
+    input_size = model_input_size(model)
+    sample = np.random.rand(1, input_size, input_size, 3).astype(np.float32)
+    timings = []
+    with tf.device('/CPU:0'):
+        for _ in range(warmup):
+            model(sample, training=False)
+        for _ in range(runs):
+            start = time.perf_counter()
+            model(sample, training=False)
+            timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def distill(teacher, student, train_generator, validation_generator, student_path,
+            epochs=20, learning_rate=0.001, temperature=4.0, alpha=0.1, patience=5,
+            history=None):
+    """
+    Train the student against the teacher's soft targets
+
+    Keeps the student weights with the best validation accuracy on disk at
+    student_path and stops after `patience` epochs without improvement.
+
+    Pass a `history` dict to follow progress even if training is interrupted;
+    its "saved" flag tells whether this run has written student_path yet.
+
+    Returns:
+        dict: Per-epoch "loss" and "val_accuracy" lists and the "saved" flag
+    """
+    optimizer = Adam(learning_rate)
+    student_size = model_input_size(student)
+    teacher_size = model_input_size(teacher)
+    if history is None:
+        history = {}
+    history.update({"loss": [], "val_accuracy": [], "saved": False})
+    best_accuracy = -1.0
+    epochs_without_improvement = 0
+
+    @tf.function
+    def train_step(teacher_images, student_images, labels):
+        teacher_probs = teacher(teacher_images, training=False)
+        with tf.GradientTape() as tape:
+            student_probs = student(student_images, training=True)
+            loss = distillation_loss(labels, teacher_probs, student_probs, temperature, alpha)
+        gradients = tape.gradient(loss, student.trainable_variables)
+        optimizer.apply_gradients(zip(gradients, student.trainable_variables))
+        return loss
+
+    for epoch in range(epochs):
+        losses = []
+        for step in range(len(train_generator)):
+            images, labels = train_generator[step]
+            images, labels = augment_batch(images, labels)
+            images = tf.convert_to_tensor(images, dtype=tf.float32)
+            labels = tf.convert_to_tensor(labels, dtype=tf.float32)
+            loss = train_step(
+                resize_batch(images, teacher_size),
+                resize_batch(images, student_size),
+                labels
+            )
+            losses.append(float(loss))
+        train_generator.on_epoch_end()
+
+        val_accuracy = evaluate_accuracy(student, validation_generator)
+        history["loss"].append(float(np.mean(losses)))
+        history["val_accuracy"].append(val_accuracy)
+        print(f"Epoch {epoch + 1}/{epochs} - loss: {history['loss'][-1]:.4f} "
+              f"- val_accuracy: {val_accuracy:.4f}")
+
+        if val_accuracy > best_accuracy:
+            best_accuracy = val_accuracy
+            epochs_without_improvement = 0
+            student.save(student_path)
+            history["saved"] = True
+            print(f"  ✓ Saved improved student to {student_path}")
+        else:
+            epochs_without_improvement += 1
+            if epochs_without_improvement >= patience:
+                print(f"  Early stopping: no improvement for {patience} epochs")
+                break
+
+    return history
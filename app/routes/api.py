@@ -1,7 +1,14 @@
 from flask import Blueprint, request, jsonify
-import io
-from PIL import Image
-from config import ALLOWED_EXTENSIONS
+from config import (
+    ALLOWED_EXTENSIONS,
+    MAX_FILES_PER_REQUEST,
+    MAX_IMAGE_PIXELS,
+    MAX_FULL_DECODE_PIXELS,
+    MAX_DECODE_SIDE,
+)
+from app.utils import prediction_log
+from app.utils.image_io import decode_slots, load_upload_image
+from app.utils.memory import memory_tracker
 
 api_bp = Blueprint('api', __name__)
 
@@ -10,6 +17,11 @@ def health_check():
     """Health check endpoint"""
     return jsonify({"status": "healthy", "service": "NeuroLeafAI API"})
 
+@api_bp.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Per-request memory metrics (populated when MEMORY_TRACKING=1)"""
+    return jsonify({"memory": memory_tracker.snapshot()})
+
 @api_bp.route('/api/detect', methods=['POST'])
 def detect_disease():
     """API endpoint for disease detection"""
@@ -23,6 +35,14 @@ def detect_disease():
     if not files:
         return jsonify({"error": "No file provided"}), 400
 
+    if len(files) > MAX_FILES_PER_REQUEST:
+        return jsonify({"error": f"At most {MAX_FILES_PER_REQUEST} files per request"}), 400
+
+    # Optional override of the TILED_INFERENCE setting: tiled=1 / tiled=0
+    tiled = request.form.get('tiled')
+    if tiled is not None:
+        tiled = tiled.lower() in ('1', 'true', 'yes', 'on')
+
     results = []
     from app.routes.main import get_detector
     detector = get_detector()
@@ -33,29 +53,34 @@ def detect_disease():
             continue
 
         if file and allowed_file(file.filename):
+            img = None
             try:
-                # Read image into memory
-                img_data = file.read()
-                img = Image.open(io.BytesIO(img_data))
-                
-                # Convert to RGB if needed
-                if img.mode != 'RGB':
-                    img = img.convert('RGB')
-                
-                # Create in-memory file-like object
-                in_memory_file = io.BytesIO()
-                img.save(in_memory_file, format='JPEG')
-                in_memory_file.seek(0)
+                # Hash the upload bytes before decoding reads the stream
+                image_hash = prediction_log.upload_fingerprint(file.stream)
                 
-                # Process with detector
-                if detector is None:
-                    result = {"error": "Model not available"}
-                else:
-                    result = detector.predict_from_stream(in_memory_file)
+                # Bound how many full-size decodes and inferences run at once
+                with decode_slots:
+                    # Decode straight from the upload stream at a bounded size
+                    img = load_upload_image(
+                        file.stream,
+                        max_pixels=MAX_IMAGE_PIXELS,
+                        max_side=MAX_DECODE_SIDE,
+                        max_full_decode_pixels=MAX_FULL_DECODE_PIXELS,
+                    )
+                    file.close()
+                    
+                    # Process with detector
+                    if detector is None:
+                        result = {"error": "Model not available"}
+                    else:
+                        result = detector.predict_from_image(img, tiled=tiled, image_hash=image_hash)
                 
                 results.append(result)
             except Exception as e:
                 results.append({"error": str(e)})
+            finally:
+                if img is not None:
+                    img.close()
         else:
             results.append({"error": "Invalid file type", "filename": file.filename})
 
@@ -0,0 +1,57 @@
+import os
+import mimetypes
+from flask import Blueprint, request, send_from_directory, url_for, abort, current_app
+from config import STATIC_DIST_FOLDER
+from app.utils.assets import load_manifest
+
+assets_bp = Blueprint('assets', __name__)
+
+# Fingerprinted URLs change whenever the content does, so they never go stale
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Preferred first
+PRECOMPRESSED_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+def asset_url(filename):
+    """
+    Template helper: URL of the fingerprinted build of a static asset
+
+    Falls back to the regular static URL in debug mode, where the manifest
+    loaded at startup would serve stale builds of files being edited, and
+    when the asset is missing from the manifest (e.g. before build_assets.py
+    has been run).
+    """
+    if current_app.debug:
+        return url_for('static', filename=filename)
+    hashed = current_app.extensions['asset_manifest'].get(filename)
+    if hashed is None:
+        return url_for('static', filename=filename)
+    return url_for('assets.fingerprinted_asset', filename=hashed)
+
+def init_assets(app):
+    """Load the asset manifest and expose asset_url() to templates"""
+    app.extensions['asset_manifest'] = load_manifest(STATIC_DIST_FOLDER)
+    app.register_blueprint(assets_bp)
+    app.add_template_global(asset_url)
+
+@assets_bp.route('/assets/<path:filename>')
+def fingerprinted_asset(filename):
+    """Serve a fingerprinted asset, preferring a precompressed variant"""
+    if filename.endswith(('.br', '.gz', '.json')):
+        abort(404)
+
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    accepted = request.accept_encodings
+
+    for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+        variant = filename + suffix
+        if accepted[encoding] and os.path.isfile(os.path.join(STATIC_DIST_FOLDER, variant)):
+            response = send_from_directory(STATIC_DIST_FOLDER, variant, mimetype=mimetype)
+            response.headers['Content-Encoding'] = encoding
+            break
+    else:
+        response = send_from_directory(STATIC_DIST_FOLDER, filename, mimetype=mimetype)
+
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
@@ -2,12 +2,17 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash,
 import os
 import time
 import threading
-import io
-import base64
 from werkzeug.utils import secure_filename
-from config import ALLOWED_EXTENSIONS
-from PIL import Image
-import numpy as np
+from config import (
+    ALLOWED_EXTENSIONS,
+    MAX_FILES_PER_REQUEST,
+    MAX_IMAGE_PIXELS,
+    MAX_FULL_DECODE_PIXELS,
+    MAX_DECODE_SIDE,
+    PREVIEW_MAX_SIDE,
+)
+from app.utils import prediction_log
+from app.utils.image_io import decode_slots, load_upload_image, make_preview_data_uri
 
 main_bp = Blueprint('main', __name__)
 
@@ -57,40 +62,44 @@ def upload():
             flash('No file selected. Please choose an image or take a photo.')
             return redirect(request.url)
 
+        if len(files) > MAX_FILES_PER_REQUEST:
+            message = f'Please upload at most {MAX_FILES_PER_REQUEST} images at a time.'
+            return render_template('upload.html', error=message), 400
+
         results = []
         detector = get_detector()
         for file in files:
             if file and allowed_file(file.filename):
+                img = None
                 try:
-                    # Read image into memory
-                    img_data = file.read()
-                    img = Image.open(io.BytesIO(img_data))
-                    
-                    # Convert to RGB if needed (handle RGBA, grayscale, etc.)
-                    if img.mode != 'RGB':
-                        img = img.convert('RGB')
-                    
-                    # Encode image as base64 for display
-                    buffered = io.BytesIO()
-                    img.save(buffered, format='JPEG')
-                    img_base64 = base64.b64encode(buffered.getvalue()).decode()
-                    
-                    # Create in-memory file-like object for analysis
-                    in_memory_file = io.BytesIO()
-                    img.save(in_memory_file, format='JPEG')
-                    in_memory_file.seek(0)
-                    
-                    # Process the file with our CNN model
-                    if detector is None:
-                        res = {"error": "Model not available. Check server logs for model load errors."}
-                    else:
-                        res = detector.predict_from_stream(in_memory_file)
+                    # Hash the upload bytes before decoding reads the stream
+                    image_hash = prediction_log.upload_fingerprint(file.stream)
                     
-                    # Add image data to result
-                    res['image_data'] = f"data:image/jpeg;base64,{img_base64}"
+                    # Bound how many full-size decodes and inferences run at once
+                    with decode_slots:
+                        # Decode straight from the upload stream at a bounded size
+                        img = load_upload_image(
+                            file.stream,
+                            max_pixels=MAX_IMAGE_PIXELS,
+                            max_side=MAX_DECODE_SIDE,
+                            max_full_decode_pixels=MAX_FULL_DECODE_PIXELS,
+                        )
+                        file.close()
+                        
+                        # Process the image with our CNN model
+                        if detector is None:
+                            res = {"error": "Model not available. Check server logs for model load errors."}
+                        else:
+                            res = detector.predict_from_image(img, image_hash=image_hash)
+                        
+                        # Only a small preview outlives this iteration
+                        res['image_data'] = make_preview_data_uri(img, max_side=PREVIEW_MAX_SIDE)
                 except Exception as e:
                     res = {"error": str(e)}
                     res['image_data'] = None
+                finally:
+                    if img is not None:
+                        img.close()
 
                 results.append(res)
 
@@ -0,0 +1,137 @@
+import os
+import re
+import json
+import gzip
+import shutil
+import hashlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+# Files under app/static that get fingerprinted (uploads/ is runtime data)
+ASSET_DIRS = ('css', 'js', 'images')
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.svg'}
+HASH_LENGTH = 12
+
+
+# Alternatives are tried in order, so quoted strings are matched (and kept
+# verbatim) before any comment or whitespace rule can look inside them
+CSS_TOKENS = re.compile(
+    r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')"""  # quoted string
+    r'|(/\*.*?\*/)'                                # comment
+    r'|\s*;\s*(\})\s*'                             # redundant last semicolon
+    r'|\s*([{};,>])\s*'                            # punctuation
+    r'|\s+',                                       # other whitespace
+    re.S,
+)
+
+
+def _minify_css_token(match):
+    string, comment, close, punctuation = match.groups()
+    if string is not None:
+        return string
+    if comment is not None:
+        return ''
+    return close or punctuation or ' '
+
+
+def minify_css(source):
+    """
+    Conservative CSS minifier: strips comments and redundant whitespace
+
+    Whitespace is only removed next to characters where it can never be
+    significant, so selectors such as "a :hover" keep their meaning, and
+    quoted strings (content, url("..."), font names) are left untouched.
+    """
+    return CSS_TOKENS.sub(_minify_css_token, source).strip()
+
+
+def minify_js(source):
+    """
+    Minify JavaScript with rjsmin when it is installed
+
+    There is no safe regex-only JS minifier, so without rjsmin the source is
+    returned unchanged and only precompression is applied.
+    """
+    if rjsmin is None:
+        return source
+    return rjsmin.jsmin(source)
+
+
+def fingerprint(filename, content):
+    """Insert a content hash before the extension: css/style.<hash>.css"""
+    digest = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+    root, ext = os.path.splitext(filename)
+    return f"{root}.{digest}{ext}"
+
+
+def build_assets(static_dir, dist_dir):
+    """
+    Minify, fingerprint and precompress the static assets
+
+    Args:
+        static_dir (str): Source static folder (app/static)
+        dist_dir (str): Output folder, replaced on every build
+
+    Returns:
+        dict: Manifest mapping logical names to fingerprinted names
+    """
+    if os.path.isdir(dist_dir):
+        shutil.rmtree(dist_dir)
+    os.makedirs(dist_dir)
+
+    manifest = {}
+    for asset_dir in ASSET_DIRS:
+        for root, _, files in os.walk(os.path.join(static_dir, asset_dir)):
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                logical = os.path.relpath(path, static_dir).replace(os.sep, '/')
+                ext = os.path.splitext(name)[1].lower()
+
+                with open(path, 'rb') as f:
+                    content = f.read()
+                if ext == '.css':
+                    content = minify_css(content.decode('utf-8')).encode('utf-8')
+                elif ext == '.js':
+                    content = minify_js(content.decode('utf-8')).encode('utf-8')
+
+                hashed = fingerprint(logical, content)
+                out_path = os.path.join(dist_dir, *hashed.split('/'))
+                os.makedirs(os.path.dirname(out_path), exist_ok=True)
+                with open(out_path, 'wb') as f:
+                    f.write(content)
+
+                if ext in COMPRESSIBLE_EXTENSIONS:
+                    with open(out_path + '.gz', 'wb') as f:
+                        # mtime=0 keeps the output reproducible between builds
+                        f.write(gzip.compress(content, compresslevel=9, mtime=0))
+                    if brotli is not None:
+                        with open(out_path + '.br', 'wb') as f:
+                            f.write(brotli.compress(content, quality=11))
+
+                manifest[logical] = hashed
+
+    with open(os.path.join(dist_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    return manifest
+
+
+def load_manifest(dist_dir):
+    """Load the asset manifest, or an empty one if assets were not built"""
+    manifest_path = os.path.join(dist_dir, 'manifest.json')
+    if not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠ Could not read asset manifest {manifest_path}: {e}")
+        return {}
@@ -0,0 +1,93 @@
+import io
+import base64
+import threading
+from PIL import Image
+from config import MAX_CONCURRENT_DECODES
+
+# Process-wide bound on full-size decodes and inference running at once, so
+# the per-request memory budget also holds across a worker's threads
+decode_slots = threading.BoundedSemaphore(MAX_CONCURRENT_DECODES)
+
+
+def load_upload_image(stream, max_pixels=24_000_000, max_side=2048,
+                      max_full_decode_pixels=12_000_000):
+    """
+    Decode an uploaded image into a bounded-size RGB PIL image
+    
+    The header is inspected before any pixel data is decoded so oversized
+    images are rejected up front. JPEGs are decoded directly at a reduced
+    scale, so for them max_pixels applies to the reduced decode size. Other
+    formats (PNG, GIF) are always decoded at full size, so they get the much
+    lower max_full_decode_pixels cap. Images are downscaled before the RGB
+    conversion so only one full-size buffer ever exists.
+    
+    Args:
+        stream: File-like object positioned at the start of the image
+        max_pixels (int): Largest accepted width * height of a JPEG decode
+        max_side (int): Longest side of the decoded image
+        max_full_decode_pixels (int): Largest accepted width * height for
+            formats that cannot be decoded at a reduced scale
+    
+    Returns:
+        PIL.Image: RGB image no larger than max_side on either side
+    """
+    img = Image.open(stream)
+    source_size = img.size
+    
+    # Let the JPEG decoder scale down by 1/2, 1/4 or 1/8 while decoding
+    if img.format == 'JPEG':
+        img.draft('RGB', (max_side, max_side))
+        limit = max_pixels
+    else:
+        limit = max_full_decode_pixels
+    
+    width, height = img.size
+    if width * height > limit:
+        img.close()
+        raise ValueError(
+            f"Image is too large ({source_size[0]}x{source_size[1]}); "
+            f"the limit is {limit:,} pixels"
+        )
+    
+    # Decode now so the upload stream can be released by the caller
+    img.load()
+    
+    # Palette and bilevel images cannot be resampled, so convert them first
+    if img.mode in ('P', '1'):
+        converted = img.convert('RGB')
+        img.close()
+        img = converted
+    
+    if max(img.size) > max_side:
+        img.thumbnail((max_side, max_side), Image.LANCZOS)
+    
+    if img.mode != 'RGB':
+        converted = img.convert('RGB')
+        img.close()
+        img = converted
+    
+    return img
+
+
+def make_preview_data_uri(img, max_side=800, quality=85):
+    """
+    Encode a downscaled JPEG preview of an image as a data URI
+    
+    Args:
+        img (PIL.Image): RGB image to preview (left unmodified)
+        max_side (int): Longest side of the preview
+        quality (int): JPEG quality of the preview
+    
+    Returns:
+        str: data:image/jpeg;base64 URI
+    """
+    preview = img.copy()
+    preview.thumbnail((max_side, max_side), Image.LANCZOS)
+    
+    with io.BytesIO() as buffered:
+        preview.save(buffered, format='JPEG', quality=quality)
+        with buffered.getbuffer() as view:
+            encoded = base64.b64encode(view).decode('ascii')
+    preview.close()
+    
+    return "data:image/jpeg;base64," + encoded
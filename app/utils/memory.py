@@ -0,0 +1,106 @@
+import os
+import threading
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class RequestMemoryTracker:
+    """
+    Per-request memory accounting
+
+    Two numbers are recorded per request:
+    - python_heap_peak: tracemalloc peak above the request's baseline. It
+      covers Python and NumPy allocations only; Pillow and TensorFlow keep
+      pixel/tensor buffers in native memory that tracemalloc cannot see.
+    - rss_delta: change in resident set size (/proc/self/statm) between the
+      start and end of the request, which does include native buffers but
+      is a net change, not a peak, and misses memory freed before the end.
+
+    Both are process-wide measurements, so overlapping requests see each
+    other's allocations. The tracemalloc peak of an overlapping window is
+    an upper bound, never an under-count.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.count = 0
+        self.total_heap_peak_bytes = 0
+        self.max_heap_peak_bytes = 0
+        self.last_heap_peak_bytes = 0
+        self.max_rss_delta_bytes = 0
+        self.last_rss_delta_bytes = 0
+
+    def start(self):
+        """Begin tracking a request and return its baseline (heap, rss)"""
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            if self._in_flight == 0:
+                tracemalloc.reset_peak()
+            self._in_flight += 1
+            current, _ = tracemalloc.get_traced_memory()
+        return current, current_rss_bytes()
+
+    def measure(self, baseline):
+        """Return (python_heap_peak, rss_delta) in bytes without ending tracking"""
+        heap_baseline, rss_baseline = baseline
+        _, peak = tracemalloc.get_traced_memory()
+        rss = current_rss_bytes()
+        rss_delta = rss - rss_baseline if rss is not None and rss_baseline is not None else None
+        return max(peak - heap_baseline, 0), rss_delta
+
+    def stop(self, baseline):
+        """Finish tracking a request and return (python_heap_peak, rss_delta)"""
+        with self._lock:
+            heap_peak, rss_delta = self.measure(baseline)
+            self._in_flight = max(self._in_flight - 1, 0)
+
+            self.count += 1
+            self.total_heap_peak_bytes += heap_peak
+            self.max_heap_peak_bytes = max(self.max_heap_peak_bytes, heap_peak)
+            self.last_heap_peak_bytes = heap_peak
+            if rss_delta is not None:
+                self.max_rss_delta_bytes = max(self.max_rss_delta_bytes, rss_delta)
+                self.last_rss_delta_bytes = rss_delta
+        return heap_peak, rss_delta
+
+    def snapshot(self):
+        """Return the aggregated metrics as a JSON-serialisable dict"""
+        with self._lock:
+            avg = self.total_heap_peak_bytes / self.count if self.count else 0
+            return {
+                "requests_tracked": self.count,
+                "python_heap_peak_bytes_last": self.last_heap_peak_bytes,
+                "python_heap_peak_bytes_max": self.max_heap_peak_bytes,
+                "python_heap_peak_bytes_avg": round(avg),
+                "rss_delta_bytes_last": self.last_rss_delta_bytes,
+                "rss_delta_bytes_max": self.max_rss_delta_bytes,
+                "process_rss_bytes": current_rss_bytes(),
+                "process_max_rss_bytes": max_rss_bytes(),
+            }
+
+
+def current_rss_bytes():
+    """Current resident set size in bytes from /proc/self/statm (None if unavailable)"""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf('SC_PAGE_SIZE')
+
+
+def max_rss_bytes():
+    """Process-wide resident set high-water mark in bytes (None if unknown)"""
+    if resource is None:
+        return None
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+memory_tracker = RequestMemoryTracker()
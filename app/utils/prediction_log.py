@@ -0,0 +1,257 @@
+"""
+Asynchronous, batched prediction log
+
+The request path only appends a tuple to an in-memory deque. A background
+thread drains it in batches and appends each column to its own binary file
+inside a segment directory:
+
+    <log_dir>/<UTC start>-<pid>-<seq>/
+        meta.json            model version, top-k, column dtypes/shapes
+        timestamp.bin        float64 unix time
+        latency_ms.bin       float32
+        class_ids.bin        int16[top_k], most probable first
+        probabilities.bin    float32[top_k]
+        tiles.bin            int16 tiles in the batch (0 = single-pass inference)
+        image_hash.bin       16-byte BLAKE2b digest of the uploaded file (optional)
+
+Probabilities are always the whole-image softmax, so rows from tiled and
+single-pass inference are comparable; the tiles column tells them apart.
+
+Segments rotate on size, age or model version change, and each column can be
+memory-mapped with numpy for offline queries (see read_segment()).
+"""
+
+import os
+import json
+import time
+import atexit
+import hashlib
+import threading
+from collections import deque
+from datetime import datetime, timezone
+import numpy as np
+
+HASH_BYTES = 16
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+class PredictionLog:
+    def __init__(self, log_dir, top_k=5, batch_size=256, flush_interval=2.0,
+                 max_segment_bytes=64 * 1024 * 1024, max_segment_age=3600,
+                 max_queue=10000, hash_images=False):
+        self.log_dir = log_dir
+        self.top_k = top_k
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age = max_segment_age
+        self.hash_images = hash_images
+        self.dropped = 0
+
+        self._queue = deque()
+        self._max_queue = max_queue
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self._segment = None
+        self._sequence = 0
+
+    def record(self, model_version, probabilities, latency_ms, image_hash=None, tiles=0):
+        """
+        Queue one prediction; called on the request path, so it only appends
+        to a deque (top-k selection and file writes happen in the background
+        writer)
+        """
+        if len(self._queue) >= self._max_queue:
+            self.dropped += 1
+            return
+        if not self.hash_images:
+            image_hash = None
+        self._queue.append((time.time(), model_version, probabilities, latency_ms, image_hash, tiles))
+        if len(self._queue) >= self.batch_size:
+            self._wake.set()
+
+    def start(self):
+        """Start the background writer (idempotent)"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='prediction-log', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Flush everything still queued and stop the writer"""
+        if self._thread is None:
+            return
+        self._stopping = True
+        self._wake.set()
+        self._thread.join(timeout=10)
+        self._thread = None
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                while self._queue:
+                    self._flush(self._drain())
+            except Exception as e:
+                print(f"✗ Prediction log write failed: {e}")
+            if self._stopping:
+                return
+
+    def _drain(self):
+        batch = []
+        while self._queue and len(batch) < self.batch_size:
+            batch.append(self._queue.popleft())
+        return batch
+
+    def _flush(self, batch):
+        # A batch may span a model change; write each version's run separately
+        start = 0
+        for end in range(1, len(batch) + 1):
+            if end == len(batch) or batch[end][1] != batch[start][1]:
+                self._write(batch[start][1], batch[start:end])
+                start = end
+
+    def _write(self, model_version, records):
+        probabilities = np.stack([np.asarray(r[2], dtype=np.float32).ravel() for r in records])
+        k = min(self.top_k, probabilities.shape[1])
+        top = np.argsort(-probabilities, axis=1)[:, :k]
+
+        columns = {
+            'timestamp': np.array([r[0] for r in records], dtype=np.float64),
+            'latency_ms': np.array([r[3] for r in records], dtype=np.float32),
+            'class_ids': top.astype(np.int16),
+            'probabilities': np.take_along_axis(probabilities, top, axis=1),
+            'tiles': np.array([r[5] for r in records], dtype=np.int16),
+        }
+        if self.hash_images:
+            hashes = [r[4] or b'\0' * HASH_BYTES for r in records]
+            columns['image_hash'] = np.array(hashes, dtype=f'S{HASH_BYTES}')
+
+        segment = self._current_segment(model_version, columns)
+        written = []
+        try:
+            for name, values in columns.items():
+                path = os.path.join(segment['path'], name + '.bin')
+                written.append((path, os.path.getsize(path) if os.path.exists(path) else 0))
+                with open(path, 'ab') as f:
+                    f.write(values.tobytes())
+        except Exception:
+            # Keep columns row-aligned: roll back this batch and move later
+            # batches to a fresh segment in case the rollback fails too
+            self._segment = None
+            for path, size in written:
+                try:
+                    os.truncate(path, size)
+                except OSError:
+                    pass
+            raise
+        segment['bytes'] += sum(values.nbytes for values in columns.values())
+
+    def _current_segment(self, model_version, columns):
+        segment = self._segment
+        if (segment is None
+                or segment['model_version'] != model_version
+                or segment['bytes'] >= self.max_segment_bytes
+                or time.time() - segment['created'] >= self.max_segment_age):
+            segment = self._segment = self._open_segment(model_version, columns)
+        return segment
+
+    def _open_segment(self, model_version, columns):
+        self._sequence += 1
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+        path = os.path.join(self.log_dir, f"{stamp}-{os.getpid()}-{self._sequence:04d}")
+        os.makedirs(path, exist_ok=True)
+        meta = {
+            'model_version': model_version,
+            'top_k': int(columns['class_ids'].shape[1]),
+            'created': time.time(),
+            'columns': {
+                name: {'dtype': values.dtype.str, 'shape': list(values.shape[1:])}
+                for name, values in columns.items()
+            },
+        }
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+        return {'path': path, 'model_version': model_version,
+                'created': meta['created'], 'bytes': 0}
+
+
+def fingerprint(stream):
+    """
+    BLAKE2b digest of an uploaded file, read in chunks from its stream
+
+    Hashing the upload bytes rather than the model input keeps the digest
+    stable across models with different input sizes. The stream position is
+    restored so the image can still be decoded from it.
+    """
+    position = stream.tell()
+    digest = hashlib.blake2b(digest_size=HASH_BYTES)
+    for chunk in iter(lambda: stream.read(HASH_CHUNK_BYTES), b''):
+        digest.update(chunk)
+    stream.seek(position)
+    return digest.digest()
+
+
+def list_segments(log_dir):
+    """Segment directories, oldest first"""
+    if not os.path.isdir(log_dir):
+        return []
+    return sorted(
+        os.path.join(log_dir, name)
+        for name in os.listdir(log_dir)
+        if os.path.exists(os.path.join(log_dir, name, 'meta.json'))
+    )
+
+
+def read_segment(segment_path):
+    """
+    Memory-map the columns of one segment
+
+    Returns:
+        tuple: (meta dict, {column name: numpy.memmap}); all columns are
+        truncated to the same number of rows in case a write was cut short
+    """
+    with open(os.path.join(segment_path, 'meta.json')) as f:
+        meta = json.load(f)
+
+    columns = {}
+    for name, spec in meta['columns'].items():
+        path = os.path.join(segment_path, name + '.bin')
+        dtype = np.dtype(spec['dtype'])
+        row_bytes = dtype.itemsize * int(np.prod(spec['shape'], dtype=np.int64))
+        rows = os.path.getsize(path) // row_bytes if os.path.exists(path) else 0
+        if rows == 0:
+            columns[name] = np.empty((0, *spec['shape']), dtype=dtype)
+        else:
+            columns[name] = np.memmap(path, dtype=dtype, mode='r', shape=(rows, *spec['shape']))
+
+    rows = min((len(values) for values in columns.values()), default=0)
+    return meta, {name: values[:rows] for name, values in columns.items()}
+
+
+_log = None
+
+
+def configure(log_dir, **kwargs):
+    """Create and start the process-wide prediction log"""
+    global _log
+    if _log is None:
+        _log = PredictionLog(log_dir, **kwargs)
+        _log.start()
+    return _log
+
+
+def upload_fingerprint(stream):
+    """Digest of an upload for record(), or None when hashing is off"""
+    if _log is None or not _log.hash_images:
+        return None
+    return fingerprint(stream)
+
+
+def record(model_version, probabilities, latency_ms, image_hash=None, tiles=0):
+    """Queue a prediction on the process-wide log (no-op when not configured)"""
+    if _log is not None:
+        _log.record(model_version, probabilities, latency_ms, image_hash, tiles)
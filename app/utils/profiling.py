@@ -0,0 +1,109 @@
+import os
+import io
+import hmac
+import json
+import pstats
+import random
+import cProfile
+import threading
+from datetime import datetime, timezone
+
+
+class RequestProfiler:
+    """
+    Opt-in cProfile capture for selected requests
+
+    A request is profiled when it carries the admin header with the right
+    token or when it is picked by the sampling rate. Only one request is
+    profiled at a time (cProfile cannot run several profilers at once on
+    recent Pythons); concurrent candidates are simply not profiled.
+    """
+
+    def __init__(self, profile_dir, sample_rate=0.0, admin_token='', max_files=50):
+        self.profile_dir = profile_dir
+        self.sample_rate = sample_rate
+        self.admin_token = admin_token
+        self.max_files = max_files
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.sample_rate > 0 or bool(self.admin_token)
+
+    def trigger(self, header_value):
+        """Return why a request should be profiled, or None"""
+        if (self.admin_token and header_value
+                and hmac.compare_digest(header_value.encode(), self.admin_token.encode())):
+            return 'header'
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return 'sample'
+        return None
+
+    def start(self):
+        """Start profiling the current thread; returns None if busy"""
+        if not self._lock.acquire(blocking=False):
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiling tool is active in this process
+            self._lock.release()
+            return None
+        return profiler
+
+    def stop(self, profiler, metadata):
+        """Stop profiling, write the profile and its metadata, prune old ones"""
+        try:
+            profiler.disable()
+        finally:
+            self._lock.release()
+
+        os.makedirs(self.profile_dir, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')
+        name = f"{stamp}-{metadata.get('endpoint') or 'request'}".replace('/', '_')
+        profiler.dump_stats(os.path.join(self.profile_dir, name + '.prof'))
+        with open(os.path.join(self.profile_dir, name + '.json'), 'w') as f:
+            json.dump(metadata, f, indent=2)
+
+        self.prune()
+        return name
+
+    def prune(self):
+        """Keep only the newest max_files profiles"""
+        names = list_profiles(self.profile_dir)
+        excess = len(names) - self.max_files
+        for name in names[:max(excess, 0)]:
+            for ext in ('.prof', '.json'):
+                try:
+                    os.remove(os.path.join(self.profile_dir, name + ext))
+                except FileNotFoundError:
+                    pass
+
+
+def list_profiles(profile_dir):
+    """Names of captured profiles, oldest first"""
+    if not os.path.isdir(profile_dir):
+        return []
+    return sorted(
+        name[:-len('.prof')]
+        for name in os.listdir(profile_dir)
+        if name.endswith('.prof')
+    )
+
+
+def load_metadata(profile_dir, name):
+    """Request metadata stored next to a profile ({} if missing)"""
+    try:
+        with open(os.path.join(profile_dir, name + '.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def summarize_profile(profile_dir, name, sort='cumulative', limit=25):
+    """Render the top functions of a captured profile as text"""
+    out = io.StringIO()
+    stats = pstats.Stats(os.path.join(profile_dir, name + '.prof'), stream=out)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return out.getvalue()
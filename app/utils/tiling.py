@@ -0,0 +1,189 @@
+import numpy as np
+from PIL import Image
+
+
+def tile_boxes(width, height, tile_size=224, overlap=0.5):
+    """
+    Compute overlapping tile boxes covering an image
+
+    The last row/column is aligned to the image edge so the whole image is
+    covered without padding.
+
+    Args:
+        width (int): Image width
+        height (int): Image height
+        tile_size (int): Side of the square tiles
+        overlap (float): Fraction of a tile shared with its neighbour
+
+    Returns:
+        list: (left, top, right, bottom) boxes
+    """
+    stride = _tile_stride(tile_size, overlap)
+
+    def starts(length):
+        if length <= tile_size:
+            return [0]
+        positions = list(range(0, length - tile_size + 1, stride))
+        if positions[-1] != length - tile_size:
+            positions.append(length - tile_size)
+        return positions
+
+    return [
+        (left, top, left + tile_size, top + tile_size)
+        for top in starts(height)
+        for left in starts(width)
+    ]
+
+
+def _tile_stride(tile_size, overlap):
+    return max(int(tile_size * (1 - overlap)), 1)
+
+
+def _tiles_along(length, tile_size, stride):
+    """Number of tiles tile_boxes() places along one side"""
+    if length <= tile_size:
+        return 1
+    return -(-(length - tile_size) // stride) + 1
+
+
+def fit_tiling_side(width, height, max_side, tile_size=224, overlap=0.5, max_tiles=48):
+    """
+    Longest side to scale an image to so its tile grid has at most max_tiles
+
+    Shrinking the image rather than dropping tiles keeps the whole image
+    covered; the result never goes below one tile.
+
+    Returns:
+        int: Longest side, at most max_side and the image's own longest side
+    """
+    stride = _tile_stride(tile_size, overlap)
+    longest = max(width, height)
+    side = min(max_side, longest)
+    while side > tile_size:
+        scale = side / longest
+        tiles = (_tiles_along(round(width * scale), tile_size, stride)
+                 * _tiles_along(round(height * scale), tile_size, stride))
+        if tiles <= max_tiles:
+            break
+        side -= 1
+    return side
+
+
+def vegetation_fraction(tile):
+    """
+    Fraction of pixels that look like plant tissue
+
+    Uses the excess-green index (2g - r - b on chromaticity coordinates) for
+    green tissue plus a warm-hue test so yellowed and brown diseased leaves
+    are not treated as background.
+
+    Args:
+        tile (numpy.ndarray): HxWx3 float array in [0, 1]
+    """
+    r, g, b = tile[..., 0], tile[..., 1], tile[..., 2]
+    total = r + g + b + 1e-6
+    excess_green = (2 * g - r - b) / total
+    green = excess_green > 0.05
+    # Yellow/brown lesions: red and green both clearly above blue
+    warm = (r > b + 0.08) & (g > b + 0.04)
+    return float(np.mean(green | warm))
+
+
+def is_foreground_tile(tile, min_vegetation=0.15, min_std=0.04):
+    """Cheap background filter: enough plant pixels and some texture"""
+    return tile.std() >= min_std and vegetation_fraction(tile) >= min_vegetation
+
+
+def prepare_tiles(img, max_side=896, tile_size=224, overlap=0.5,
+                  max_tiles=48, min_vegetation=0.15, min_std=0.04):
+    """
+    Split an image into normalized foreground tiles ready for batching
+
+    The image is first scaled so its longest side is at most max_side, which
+    keeps lesions several times larger than a whole-image 224x224 resize, and
+    further down if needed so the tile grid has at most max_tiles tiles: every
+    part of the image is analysed. A side shorter than one tile is padded
+    with black (which the background filter ignores) rather than stretched.
+
+    Args:
+        img (PIL.Image): RGB image
+
+    Returns:
+        tuple: (tiles array Nx224x224x3 float32, boxes in original image
+        coordinates clipped to the image, total number of tiles before
+        filtering)
+    """
+    side = fit_tiling_side(img.width, img.height, max_side, tile_size, overlap, max_tiles)
+    scale = side / max(img.size)
+    scaled_size = (max(round(img.width * scale), 1),
+                   max(round(img.height * scale), 1))
+    scaled = img.resize(scaled_size, Image.BILINEAR)
+    pixels = np.zeros((max(scaled_size[1], tile_size), max(scaled_size[0], tile_size), 3),
+                      dtype=np.float32)
+    pixels[:scaled_size[1], :scaled_size[0]] = np.asarray(scaled, dtype=np.float32)
+    scaled.close()
+    pixels /= 255.0
+
+    boxes = tile_boxes(pixels.shape[1], pixels.shape[0], tile_size, overlap)
+    kept_tiles = []
+    kept_boxes = []
+    for left, top, right, bottom in boxes:
+        tile = pixels[top:bottom, left:right]
+        if not is_foreground_tile(tile, min_vegetation, min_std):
+            continue
+        kept_tiles.append(tile)
+        kept_boxes.append((
+            min(round(left / scale), img.width),
+            min(round(top / scale), img.height),
+            min(round(right / scale), img.width),
+            min(round(bottom / scale), img.height),
+        ))
+
+    if kept_tiles:
+        tiles = np.stack(kept_tiles)
+    else:
+        tiles = np.empty((0, tile_size, tile_size, 3), dtype=np.float32)
+    return tiles, kept_boxes, len(boxes)
+
+
+def _boxes_overlap(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def merge_regions(detections):
+    """
+    Merge overlapping tile detections of the same class into regions
+
+    Args:
+        detections (list): dicts with "class_id", "confidence" and "box"
+
+    Returns:
+        list: One dict per region with the union box, the best confidence
+        and the number of tiles it spans, most confident first
+    """
+    regions = [
+        {"class_id": d["class_id"], "confidence": d["confidence"],
+         "box": d["box"], "tiles": 1}
+        for d in sorted(detections, key=lambda d: -d["confidence"])
+    ]
+
+    # Growing a box can make it overlap regions it did not touch before,
+    # so keep merging until nothing changes
+    merged = True
+    while merged:
+        merged = False
+        for i, region in enumerate(regions):
+            for j in range(i + 1, len(regions)):
+                other = regions[j]
+                if (region["class_id"] == other["class_id"]
+                        and _boxes_overlap(region["box"], other["box"])):
+                    a, b = region["box"], other["box"]
+                    region["box"] = (min(a[0], b[0]), min(a[1], b[1]),
+                                     max(a[2], b[2]), max(a[3], b[3]))
+                    region["tiles"] += other["tiles"]
+                    del regions[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    return regions
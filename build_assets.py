@@ -0,0 +1,34 @@
+"""
+Static Asset Build Script
+
+Minifies, content-hashes and precompresses everything under app/static
+(css/, js/, images/) into app/static/dist/ and writes a manifest.json that the
+asset_url() template helper uses to emit fingerprinted URLs.
+
+Run after every change to static files (render.yaml runs it on deploy):
+    python build_assets.py
+"""
+
+import os
+from app.utils.assets import build_assets, brotli, rjsmin
+from config import BASE_DIR, STATIC_DIST_FOLDER
+
+
+if __name__ == "__main__":
+    static_dir = os.path.join(BASE_DIR, 'app', 'static')
+    manifest = build_assets(static_dir, STATIC_DIST_FOLDER)
+
+    print(f"✓ Built {len(manifest)} assets into {STATIC_DIST_FOLDER}")
+    for logical, hashed in sorted(manifest.items()):
+        source_size = os.path.getsize(os.path.join(static_dir, logical))
+        built_path = os.path.join(STATIC_DIST_FOLDER, hashed)
+        sizes = [f"{source_size:,} → {os.path.getsize(built_path):,} B"]
+        for suffix in ('.gz', '.br'):
+            if os.path.exists(built_path + suffix):
+                sizes.append(f"{suffix[1:]} {os.path.getsize(built_path + suffix):,} B")
+        print(f"  - {hashed} ({', '.join(sizes)})")
+
+    if brotli is None:
+        print("⚠ brotli not installed: only gzip variants were generated")
+    if rjsmin is None:
+        print("⚠ rjsmin not installed: JavaScript was not minified")
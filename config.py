@@ -7,8 +7,64 @@ BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 UPLOAD_FOLDER = os.path.join(BASE_DIR, 'app', 'static', 'uploads')
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
 
+# Fingerprinted, precompressed static assets (built by build_assets.py)
+STATIC_DIST_FOLDER = os.path.join(BASE_DIR, 'app', 'static', 'dist')
+
+# Upload limits (bound the peak memory a single request can hold)
+MAX_CONTENT_LENGTH = int(os.environ.get('MAX_UPLOAD_MB', 16)) * 1024 * 1024
+MAX_FILES_PER_REQUEST = int(os.environ.get('MAX_FILES_PER_REQUEST', 8))
+MAX_IMAGE_PIXELS = int(os.environ.get('MAX_IMAGE_PIXELS', 24_000_000))
+# PNG/GIF cannot be decoded at a reduced scale, so their cap is much lower
+# (12 MP RGBA is 48 MB decoded; the wire size says nothing about it)
+MAX_FULL_DECODE_PIXELS = int(os.environ.get('MAX_FULL_DECODE_PIXELS', 12_000_000))
+# Images decoded/analysed at the same time per worker process
+MAX_CONCURRENT_DECODES = int(os.environ.get('MAX_CONCURRENT_DECODES', 2))
+MAX_DECODE_SIDE = int(os.environ.get('MAX_DECODE_SIDE', 2048))
+PREVIEW_MAX_SIDE = int(os.environ.get('PREVIEW_MAX_SIDE', 800))
+
+# Tiled inference for wide field photos (opt-in): 'off' never tiles, 'on'
+# always tiles, 'auto' tiles only images at least TILED_MIN_ASPECT times
+# wider than tall (or taller than wide), i.e. panoramic field shots rather
+# than ordinary 4:3 phone photos. Each tile costs roughly one extra forward
+# pass, so the defaults keep the batch to a handful of images; the photo is
+# scaled down below TILED_MAX_SIDE when its grid would exceed MAX_TILES.
+TILED_INFERENCE = os.environ.get('TILED_INFERENCE', 'off')
+TILED_MIN_ASPECT = float(os.environ.get('TILED_MIN_ASPECT', 1.8))
+TILED_MAX_SIDE = int(os.environ.get('TILED_MAX_SIDE', 672))
+TILE_OVERLAP = float(os.environ.get('TILE_OVERLAP', 0.25))
+MAX_TILES = int(os.environ.get('MAX_TILES', 6))
+# Overlapping tiles that must agree on a disease before it can overrule the
+# whole-image prediction
+TILE_MIN_AGREEMENT = int(os.environ.get('TILE_MIN_AGREEMENT', 2))
+
+# Per-request memory accounting
+MEMORY_TRACKING = os.environ.get('MEMORY_TRACKING', '0') == '1'
+MEMORY_DEBUG_HEADER = os.environ.get('MEMORY_DEBUG_HEADER', '0') == '1'
+
+# On-demand request profiling (off unless a sample rate or admin token is set)
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0.0))
+PROFILE_ADMIN_TOKEN = os.environ.get('PROFILE_ADMIN_TOKEN', '')
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(BASE_DIR, 'profiles'))
+PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', 50))
+
+# Asynchronous prediction log for analytics and retraining
+PREDICTION_LOG_ENABLED = os.environ.get('PREDICTION_LOG', '1') == '1'
+PREDICTION_LOG_DIR = os.environ.get('PREDICTION_LOG_DIR', os.path.join(BASE_DIR, 'data', 'predictions'))
+PREDICTION_LOG_TOP_K = int(os.environ.get('PREDICTION_LOG_TOP_K', 5))
+PREDICTION_LOG_HASH_IMAGES = os.environ.get('PREDICTION_LOG_HASH_IMAGES', '1') == '1'
+PREDICTION_LOG_SEGMENT_MB = int(os.environ.get('PREDICTION_LOG_SEGMENT_MB', 64))
+PREDICTION_LOG_SEGMENT_SECONDS = int(os.environ.get('PREDICTION_LOG_SEGMENT_SECONDS', 3600))
+
 # Model paths
-MODEL_PATH = os.path.join(BASE_DIR, 'models', 'mobilenetv2_mixup_cutmix_best.keras')
+TEACHER_MODEL_PATH = os.path.join(BASE_DIR, 'models', 'mobilenetv2_mixup_cutmix_best.keras')
+STUDENT_MODEL_PATH = os.path.join(BASE_DIR, 'models', 'mobilenetv2_student.keras')
+DISTILLATION_REPORT_PATH = os.path.join(BASE_DIR, 'models', 'distillation_report.json')
+
+# Model served by DiseaseDetector; set MODEL_PATH to STUDENT_MODEL_PATH to serve
+# a distilled student (see `python train.py --distill`)
+MODEL_PATH = os.environ.get('MODEL_PATH', TEACHER_MODEL_PATH)
+# Recorded with every logged prediction; defaults to the model file name
+MODEL_VERSION = os.environ.get('MODEL_VERSION', os.path.splitext(os.path.basename(MODEL_PATH))[0])
 
 # Create directories if they don't exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
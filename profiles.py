@@ -0,0 +1,68 @@
+"""
+Inspect Request Profiles
+
+Lists and summarizes the cProfile captures written by the request profiler
+(enabled with PROFILE_SAMPLE_RATE or PROFILE_ADMIN_TOKEN, see README).
+
+Usage:
+    python profiles.py list
+    python profiles.py show <name> [--sort cumulative|tottime|ncalls] [--limit 25]
+    python profiles.py show latest
+"""
+
+import sys
+import argparse
+from datetime import datetime
+from app.utils.profiling import list_profiles, load_metadata, summarize_profile
+from config import PROFILE_DIR
+
+
+def list_command(args):
+    names = list_profiles(args.dir)
+    if not names:
+        print(f"No profiles found in {args.dir}")
+        return 0
+
+    print(f"{'NAME':<48} {'STATUS':>6} {'TIME':>10} {'TRIGGER':>8}  PATH")
+    for name in names:
+        meta = load_metadata(args.dir, name)
+        duration = meta.get('duration_ms')
+        duration = f"{duration:.1f}ms" if duration is not None else '?'
+        print(f"{name:<48} {meta.get('status', '?'):>6} {duration:>10} "
+              f"{meta.get('trigger', '?'):>8}  {meta.get('method', '')} {meta.get('path', '')}")
+    return 0
+
+
+def show_command(args):
+    names = list_profiles(args.dir)
+    name = names[-1] if args.name == 'latest' and names else args.name
+    if name not in names:
+        print(f"✗ Profile not found: {args.name}")
+        return 1
+
+    meta = load_metadata(args.dir, name)
+    print(f"Profile: {name}")
+    for key, value in meta.items():
+        if key == 'timestamp':
+            value = datetime.fromtimestamp(value).isoformat(timespec='seconds')
+        print(f"  - {key}: {value}")
+    print()
+    print(summarize_profile(args.dir, name, sort=args.sort, limit=args.limit))
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List and summarize captured request profiles")
+    parser.add_argument('--dir', default=PROFILE_DIR, help="Profile directory (default: PROFILE_DIR)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('list', help="List captured profiles, oldest first")
+
+    show_parser = subparsers.add_parser('show', help="Show request metadata and top functions")
+    show_parser.add_argument('name', help="Profile name from 'list', or 'latest'")
+    show_parser.add_argument('--sort', default='cumulative', help="pstats sort key")
+    show_parser.add_argument('--limit', type=int, default=25, help="Number of functions to show")
+
+    args = parser.parse_args()
+    commands = {'list': list_command, 'show': show_command}
+    sys.exit(commands[args.command](args))
@@ -0,0 +1,84 @@
+"""
+Query the Prediction Log
+
+Reads the append-only columnar segments written by the prediction log one
+segment at a time through numpy memory maps, so logs larger than RAM can be
+scanned.
+
+Usage:
+    python query_predictions.py summary
+    python query_predictions.py low-confidence [--threshold 0.5] [--limit 50]
+"""
+
+import os
+import sys
+import argparse
+from datetime import datetime
+import numpy as np
+from app.utils.prediction_log import list_segments, read_segment
+from config import PREDICTION_LOG_DIR
+
+
+def summary_command(args):
+    segments = list_segments(args.dir)
+    if not segments:
+        print(f"No prediction log segments found in {args.dir}")
+        return 0
+
+    print(f"{'SEGMENT':<40} {'MODEL':<36} {'ROWS':>8} {'P50 ms':>8} {'P95 ms':>8} {'TOP-1':>7}")
+    total = 0
+    for segment in segments:
+        meta, columns = read_segment(segment)
+        rows = len(columns['timestamp'])
+        total += rows
+        if rows:
+            p50, p95 = np.percentile(columns['latency_ms'], [50, 95])
+            top1 = float(np.mean(columns['probabilities'][:, 0]))
+        else:
+            p50 = p95 = top1 = float('nan')
+        name = os.path.basename(segment)
+        print(f"{name:<40} {meta['model_version']:<36} {rows:>8,} {p50:>8.1f} {p95:>8.1f} {top1:>7.3f}")
+    print(f"\nTotal predictions: {total:,}")
+    return 0
+
+
+def low_confidence_command(args):
+    shown = 0
+    for segment in list_segments(args.dir):
+        meta, columns = read_segment(segment)
+        matches = np.flatnonzero(columns['probabilities'][:, 0] < args.threshold)
+        for row in matches:
+            if shown >= args.limit:
+                return 0
+            stamp = datetime.fromtimestamp(columns['timestamp'][row]).isoformat(timespec='seconds')
+            classes = ', '.join(
+                f"{class_id}:{prob:.2f}"
+                for class_id, prob in zip(columns['class_ids'][row], columns['probabilities'][row])
+            )
+            image_hash = '-'
+            if 'image_hash' in columns:
+                # View as raw bytes: numpy strips trailing NULs from S16 items
+                image_hash = columns['image_hash'][row:row + 1].view(np.uint8).tobytes().hex()
+            tiles = int(columns['tiles'][row]) if 'tiles' in columns else 0
+            mode = f"tiled({tiles})" if tiles else "single"
+            print(f"{stamp}  {meta['model_version']}  {mode:<10} [{classes}]  {image_hash}")
+            shown += 1
+    if shown == 0:
+        print(f"No predictions below {args.threshold} confidence")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect the prediction log")
+    parser.add_argument('--dir', default=PREDICTION_LOG_DIR, help="Log directory (default: PREDICTION_LOG_DIR)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('summary', help="Rows, latency and mean top-1 confidence per segment")
+
+    low_parser = subparsers.add_parser('low-confidence', help="List predictions to review for retraining")
+    low_parser.add_argument('--threshold', type=float, default=0.5, help="Top-1 probability cutoff")
+    low_parser.add_argument('--limit', type=int, default=50, help="Maximum rows to print")
+
+    args = parser.parse_args()
+    commands = {'summary': summary_command, 'low-confidence': low_confidence_command}
+    sys.exit(commands[args.command](args))
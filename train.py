@@ -8,6 +8,11 @@ This script trains a CNN model with:
 - Early stopping
 - Model checkpointing
 - Training visualization
+- Knowledge distillation into a smaller CPU-friendly student (--distill)
+
+Usage:
+    python train.py
+    python train.py --distill --width 0.35 --input-size 160
 
 Author: NeuroLeafAI Team
 Date: 2025-11-01
@@ -15,15 +20,15 @@ Date: 2025-11-01
 
 import os
 import sys
+import json
+import argparse
 import tensorflow as tf
-from app.models.cnn_model import (
-    create_cnn_model, 
-    compile_model, 
-    create_data_generators,
-    get_callbacks,
-    plot_training_history
+from config import (
+    MODEL_PATH,
+    TEACHER_MODEL_PATH,
+    STUDENT_MODEL_PATH,
+    DISTILLATION_REPORT_PATH,
 )
-from config import MODEL_PATH
 
 # Suppress TensorFlow warnings for cleaner output
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
@@ -49,6 +54,14 @@ def train_model(data_dir, epochs=30, batch_size=32, learning_rate=0.001):
     Returns:
         tuple: (trained_model, training_history)
     """
+    from app.models.cnn_model import (
+        create_cnn_model, 
+        compile_model, 
+        create_data_generators,
+        get_callbacks,
+        plot_training_history
+    )
+    
     print("\n" + "#"*60)
     print("#" + " "*58 + "#")
     print("#" + "  NeuroLeafAI - Plant Disease Detection Training  ".center(58) + "#")
@@ -144,13 +157,173 @@ def train_model(data_dir, epochs=30, batch_size=32, learning_rate=0.001):
     return model, history
 
 
+def distill_model(data_dir, teacher_path=TEACHER_MODEL_PATH, student_path=STUDENT_MODEL_PATH,
+                  width_multiplier=0.35, input_size=160, epochs=20, batch_size=32,
+                  learning_rate=0.001, temperature=4.0, alpha=0.1,
+                  report_path=DISTILLATION_REPORT_PATH):
+    """
+    Distill the production model into a smaller student.
+    
+    The teacher labels every (MixUp/CutMix-augmented) batch with soft targets;
+    the student learns from those and the hard labels. The best student is
+    saved as a regular Keras model, so DiseaseDetector can serve it directly
+    by pointing MODEL_PATH at it.
+    
+    Args:
+        data_dir (str): Root directory containing train/ and validation/ folders
+        teacher_path (str): Trained teacher model (.keras)
+        student_path (str): Where to save the best student
+        width_multiplier (float): Student MobileNetV2 width multiplier (alpha)
+        input_size (int): Student input resolution
+        epochs (int): Maximum distillation epochs
+        batch_size (int): Images per batch
+        learning_rate (float): Adam learning rate for the student
+        temperature (float): Softmax temperature for the soft targets
+        alpha (float): Weight of the hard-label loss (1 - alpha for soft targets)
+        report_path (str): Where to write the JSON comparison report
+    
+    Returns:
+        dict: Side-by-side report of teacher and student, or None on error
+    """
+    from tensorflow.keras.models import load_model
+    from tensorflow.keras.preprocessing.image import ImageDataGenerator
+    from app.models.distillation import (
+        create_student_model,
+        distill,
+        evaluate_accuracy,
+        measure_cpu_latency,
+    )
+    
+    train_dir = os.path.join(data_dir, 'train')
+    validation_dir = os.path.join(data_dir, 'validation')
+    if not os.path.exists(train_dir) or not os.path.exists(validation_dir):
+        print(f"✗ ERROR: Expected {train_dir} and {validation_dir}")
+        return None
+    if not os.path.exists(teacher_path):
+        print(f"✗ ERROR: Teacher model not found at {teacher_path}")
+        return None
+    
+    teacher = load_model(teacher_path)
+    teacher_size = teacher.input_shape[1]
+    print(f"✓ Teacher loaded: {teacher_path} (input {teacher_size}x{teacher_size})")
+    
+    # Batches are produced at the teacher resolution and resized for the student
+    datagen = ImageDataGenerator(rescale=1./255, rotation_range=25, width_shift_range=0.1,
+                                 height_shift_range=0.1, zoom_range=0.2, shear_range=0.1,
+                                 horizontal_flip=True)
+    train_generator = datagen.flow_from_directory(
+        train_dir, target_size=(teacher_size, teacher_size), batch_size=batch_size
+    )
+    validation_generator = ImageDataGenerator(rescale=1./255).flow_from_directory(
+        validation_dir, target_size=(teacher_size, teacher_size),
+        batch_size=batch_size, shuffle=False
+    )
+    
+    teacher_classes = teacher.output_shape[-1]
+    if teacher_classes != train_generator.num_classes:
+        print(f"✗ ERROR: Teacher predicts {teacher_classes} classes but {train_dir} "
+              f"contains {train_generator.num_classes} class folders")
+        print("  Distill on the dataset the teacher was trained on.")
+        return None
+    
+    student = create_student_model(
+        train_generator.num_classes,
+        width_multiplier=width_multiplier,
+        input_size=input_size
+    )
+    print(f"✓ Student: MobileNetV2 width={width_multiplier}, input {input_size}x{input_size}")
+    
+    print("\n" + "="*60)
+    print("STARTING DISTILLATION")
+    print("="*60)
+    print(f"Epochs: {epochs} | Batch size: {batch_size} | LR: {learning_rate}")
+    print(f"Temperature: {temperature} | Hard-label weight: {alpha}")
+    print("="*60 + "\n")
+    
+    history = {}
+    try:
+        distill(teacher, student, train_generator, validation_generator, student_path,
+                epochs=epochs, learning_rate=learning_rate,
+                temperature=temperature, alpha=alpha, history=history)
+    except KeyboardInterrupt:
+        print("\n\n⚠ Distillation interrupted by user!")
+        # An existing file may be from an earlier run; report this run's student
+        if not history.get("saved"):
+            student.save(student_path)
+    
+    student = load_model(student_path)
+    
+    print("\nEvaluating teacher and student...")
+    report = {}
+    for name, model, path in (("teacher", teacher, teacher_path), ("student", student, student_path)):
+        report[name] = {
+            "path": path,
+            "input_size": model.input_shape[1],
+            "parameters": int(model.count_params()),
+            "val_accuracy": evaluate_accuracy(model, validation_generator),
+            "cpu_latency_ms": measure_cpu_latency(model),
+        }
+    report["student"]["width_multiplier"] = width_multiplier
+    report["speedup"] = report["teacher"]["cpu_latency_ms"] / report["student"]["cpu_latency_ms"]
+    report["parameter_ratio"] = report["teacher"]["parameters"] / report["student"]["parameters"]
+    
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    
+    print("\n" + "="*60)
+    print("DISTILLATION REPORT")
+    print("="*60)
+    print(f"{'':<22}{'Teacher':>18}{'Student':>18}")
+    print(f"{'Input size':<22}{report['teacher']['input_size']:>18}{report['student']['input_size']:>18}")
+    print(f"{'Parameters':<22}{report['teacher']['parameters']:>18,}{report['student']['parameters']:>18,}")
+    print(f"{'Val accuracy':<22}{report['teacher']['val_accuracy']*100:>17.2f}%{report['student']['val_accuracy']*100:>17.2f}%")
+    print(f"{'CPU latency (ms)':<22}{report['teacher']['cpu_latency_ms']:>18.1f}{report['student']['cpu_latency_ms']:>18.1f}")
+    print("="*60)
+    print(f"  • {report['speedup']:.1f}x faster, {report['parameter_ratio']:.1f}x fewer parameters")
+    print(f"  • Report saved to: {report_path}")
+    print(f"  • Serve the student with: MODEL_PATH={student_path}")
+    
+    return report
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train or distill the plant disease model")
+    parser.add_argument('--distill', action='store_true',
+                        help="Distill the production model into a smaller student")
+    parser.add_argument('--width', type=float, default=0.35,
+                        help="Student MobileNetV2 width multiplier (default: 0.35)")
+    parser.add_argument('--input-size', type=int, default=160,
+                        help="Student input resolution (default: 160)")
+    parser.add_argument('--temperature', type=float, default=4.0,
+                        help="Distillation softmax temperature (default: 4.0)")
+    parser.add_argument('--alpha', type=float, default=0.1,
+                        help="Weight of the hard-label loss (default: 0.1)")
+    parser.add_argument('--epochs', type=int, default=None,
+                        help="Override the maximum number of epochs")
+    args = parser.parse_args()
+    
     # Configuration
     DATA_DIRECTORY = "data/crop_disease_dataset"
     EPOCHS = 50              # Increased - simple model needs more epochs
     BATCH_SIZE = 32
     LEARNING_RATE = 0.001    # Standard learning rate
     
+    if args.distill:
+        report = distill_model(
+            data_dir=DATA_DIRECTORY,
+            width_multiplier=args.width,
+            input_size=args.input_size,
+            epochs=args.epochs or 20,
+            batch_size=BATCH_SIZE,
+            learning_rate=LEARNING_RATE,
+            temperature=args.temperature,
+            alpha=args.alpha
+        )
+        sys.exit(0 if report is not None else 1)
+    
+    if args.epochs:
+        EPOCHS = args.epochs
+    
     # Welcome message
     print("\n" + "*"*60)
     print("*" + " "*58 + "*")